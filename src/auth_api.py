@@ -1,17 +1,24 @@
 from datetime import datetime, timedelta
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import APIRouter, FastAPI, HTTPException, Depends, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, EmailStr
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional
 import logging
+from src.model.users import Plan
 from src.service.auth_service import AuthService
-from enum import Enum
+from src.utils.config import Config
 
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
-app = FastAPI(title="Speech Translation Auth API", version="1.0.0")
+app = FastAPI(
+    title="Speech Translation Auth API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -20,6 +27,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Auth routes live on a router so they can be mounted into another app
+router = APIRouter(prefix="/auth")
+
 # Initialize auth service
 auth_service = AuthService()
 
@@ -27,25 +37,30 @@ auth_service = AuthService()
 security = HTTPBearer()
 
 
-class Plan(Enum):
-    TRIAL = "trial"
-    PREMIUM = "premium"
-    LIMITED = "limited"
+# How long each plan stays active before falling back to LIMITED
+TRIAL_DURATION = timedelta(days=7)
+PREMIUM_DURATION = timedelta(days=30)
 
 
 # Pydantic models
 class UserRegister(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     email: EmailStr
     password: str
-    plan: str = Plan.TRIAL.value
+    plan: Plan = Plan.TRIAL
 
 
 class UserLogin(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     email: EmailStr
     password: str
 
 
 class TokenResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     access_token: str
     token_type: str = "bearer"
     user_id: int
@@ -54,6 +69,8 @@ class TokenResponse(BaseModel):
 
 
 class UserInfo(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: int
     email: str
     plan: str
@@ -63,6 +80,8 @@ class UserInfo(BaseModel):
 
 
 class TokenRevoke(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     token: str
 
 
@@ -71,7 +90,7 @@ async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ):
     token = credentials.credentials
-    user_data = auth_service.verify_token(token)
+    user_data = await run_in_threadpool(auth_service.verify_token, token)
 
     if not user_data:
         raise HTTPException(
@@ -83,42 +102,45 @@ async def get_current_user(
     return user_data
 
 
-def check_and_update_plan(user):
-    now = datetime.utcnow()
-    if user["plan"] == Plan.TRIAL.value:
-        if now - user["created_at"] > timedelta(days=7):
+def request_time() -> datetime:
+    """Current UTC time, resolved once per request by FastAPI's dependency cache"""
+    # Naive UTC to match the DateTime columns stored by AuthService
+    return datetime.utcnow()
+
+
+def check_and_update_plan(user, now: datetime):
+    if user["plan"] == Plan.TRIAL:
+        if now - user["created_at"] > TRIAL_DURATION:
             auth_service.update_user_plan(user["id"], Plan.LIMITED.value)
-    elif user["plan"] == Plan.PREMIUM.value:
-        if now - user["premium_start_date"] > timedelta(days=30):
+    elif user["plan"] == Plan.PREMIUM:
+        # Premium rows created before the start date was recorded count from
+        # account creation
+        premium_start = user["premium_start_date"] or user["created_at"]
+        if now - premium_start > PREMIUM_DURATION:
             auth_service.update_user_plan(user["id"], Plan.LIMITED.value)
     return user["plan"]
 
 
 # Auth endpoints
-@app.post("/auth/register", response_model=TokenResponse)
+@router.post("/register", response_model=TokenResponse)
 async def register_user(user_data: UserRegister):
     """Register a new user and return JWT token"""
     try:
-        # Validate plan
-        if user_data.plan not in Plan.__members__:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid plan value.",
-            )
-
-        # Create user
-        user = auth_service.create_user(
-            email=user_data.email, password=user_data.password, plan=user_data.plan
+        # Create user and its first token together (plan is validated by the
+        # UserRegister model)
+        created = await run_in_threadpool(
+            auth_service.create_user_with_token,
+            email=user_data.email,
+            password=user_data.password,
+            plan=user_data.plan.value,
         )
 
-        if not user:
+        if not created:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User with this email already exists",
             )
-
-        # Generate token
-        token = auth_service.generate_token(user)
+        user, token = created
 
         return TokenResponse(
             access_token=token,
@@ -130,20 +152,22 @@ async def register_user(user_data: UserRegister):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error in user registration: {e}")
+        logger.exception("Error in user registration: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error",
         )
 
 
-@app.post("/auth/login", response_model=TokenResponse)
-async def login_user(login_data: UserLogin):
+@router.post("/login", response_model=TokenResponse)
+async def login_user(login_data: UserLogin, now: datetime = Depends(request_time)):
     """Login user and return JWT token"""
     try:
         # Authenticate user
-        user = auth_service.authenticate_user(
-            email=login_data.email, password=login_data.password
+        user = await run_in_threadpool(
+            auth_service.authenticate_user,
+            email=login_data.email,
+            password=login_data.password,
         )
 
         if not user:
@@ -153,10 +177,10 @@ async def login_user(login_data: UserLogin):
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        check_and_update_plan(user)
+        await run_in_threadpool(check_and_update_plan, user, now)
 
         # Generate token
-        token = auth_service.generate_token(user)
+        token = await run_in_threadpool(auth_service.generate_token, user)
 
         return TokenResponse(
             access_token=token,
@@ -168,18 +192,18 @@ async def login_user(login_data: UserLogin):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error in user login: {e}")
+        logger.exception("Error in user login: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error",
         )
 
 
-@app.get("/auth/me", response_model=UserInfo)
+@router.get("/me", response_model=UserInfo)
 async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     """Get current user information"""
     try:
-        user = auth_service.get_user(current_user["user_id"])
+        user = await run_in_threadpool(auth_service.get_user, current_user["user_id"])
 
         if not user:
             raise HTTPException(
@@ -191,28 +215,30 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting user info: {e}")
+        logger.exception("Error getting user info: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error",
         )
 
 
-@app.post("/auth/revoke")
+@router.post("/revoke")
 async def revoke_token(
     token_data: TokenRevoke, current_user: dict = Depends(get_current_user)
 ):
     """Revoke a specific token"""
     try:
         # Verify the token belongs to the current user
-        token_user = auth_service.verify_token(token_data.token)
+        token_user = await run_in_threadpool(
+            auth_service.verify_token, token_data.token
+        )
 
         if not token_user or token_user["user_id"] != current_user["user_id"]:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Cannot revoke this token"
             )
 
-        success = auth_service.revoke_token(token_user["jti"])
+        success = await run_in_threadpool(auth_service.revoke_token, token_user["jti"])
 
         if not success:
             raise HTTPException(
@@ -225,18 +251,20 @@ async def revoke_token(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error revoking token: {e}")
+        logger.exception("Error revoking token: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error",
         )
 
 
-@app.post("/auth/logout")
+@router.post("/logout")
 async def logout_user(current_user: dict = Depends(get_current_user)):
     """Logout user (revoke all tokens)"""
     try:
-        success = auth_service.revoke_user_tokens(current_user["user_id"])
+        success = await run_in_threadpool(
+            auth_service.revoke_user_tokens, current_user["user_id"]
+        )
 
         if not success:
             raise HTTPException(
@@ -249,13 +277,16 @@ async def logout_user(current_user: dict = Depends(get_current_user)):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error logging out user: {e}")
+        logger.exception("Error logging out user: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error",
         )
 
 
+app.include_router(router)
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -265,4 +296,6 @@ async def health_check():
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8002)
+    logging.basicConfig(level=logging.INFO)
+    # uvicorn[standard] lets uvicorn pick uvloop and httptools automatically
+    uvicorn.run(app, host=Config.HOST, port=Config.AUTH_PORT)
@@ -5,6 +5,8 @@ from sqlalchemy import (
     DateTime,
     Boolean,
     ForeignKey,
+    Index,
+    text,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -13,6 +15,16 @@ from src.model.base import Base
 
 class Session(Base):
     __tablename__ = "sessions"
+    # token_jti and users.email are already indexed through their UNIQUE
+    # constraints; user_id needs its own index for per-user revocation.
+    __table_args__ = (
+        Index(
+            "ix_sessions_user_active",
+            "user_id",
+            sqlite_where=text("is_revoked = 0"),
+            postgresql_where=text("is_revoked = false"),
+        ),
+    )
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     token_jti = Column(String, unique=True, nullable=False)
@@ -1,6 +1,13 @@
 from src.model.base import Base
 from sqlalchemy import Column, Integer, String, DateTime, Boolean
 from datetime import datetime
+from enum import Enum
+
+
+class Plan(str, Enum):
+    TRIAL = "trial"
+    PREMIUM = "premium"
+    LIMITED = "limited"
 
 
 class User(Base):
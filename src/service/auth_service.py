@@ -1,17 +1,122 @@
 import jwt
 import bcrypt
+import functools
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerifyMismatchError
+import hashlib
+import hmac
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+import os
+import secrets
+import threading
+import time
+from cachetools import TLRUCache, TTLCache
+from datetime import datetime
+from typing import Optional, Dict, Any, Tuple
 from src.utils.config import Config
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from src.model.base import Base
-from src.model.users import User
+from src.model.users import Plan, User
 from src.model.sessions import Session
 
 logger = logging.getLogger(__name__)
 
+# Password hashing releases the GIL, so request threads hash in parallel; cap concurrent
+# hashes at the core count so bursts queue up instead of thrashing the CPU
+_HASH_SLOTS = threading.BoundedSemaphore(os.cpu_count() or 1)
+
+
+def _configure_sqlite_connection(dbapi_connection, _connection_record):
+    """Apply WAL journaling settings and a busy timeout to each new pooled connection"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    # Let the WAL grow further before a commit has to checkpoint inline; the
+    # revoked-token refresher checkpoints passively in between
+    cursor.execute("PRAGMA wal_autocheckpoint=10000")
+    cursor.close()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_engine(db_url: str):
+    """Create the engine and schema once per database URL per process"""
+    engine = create_engine(db_url, connect_args={"check_same_thread": False})
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _configure_sqlite_connection)
+    Base.metadata.create_all(engine)
+    if engine.dialect.name == "sqlite":
+        # Refresh planner statistics so the session indexes get chosen;
+        # cheap no-op when nothing changed since the last run
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA optimize")
+    return engine
+
+
+class _RevokedTokens:
+    """jti values of revoked, unexpired sessions in one database.
+
+    Revocations made in this process are added immediately; one daemon
+    thread per database reloads the set every REVOKED_TOKENS_REFRESH_SECONDS
+    to pick up other processes and drop expired entries.
+    """
+
+    def __init__(self, engine):
+        self._engine = engine
+        self._sessionmaker = sessionmaker(bind=engine)
+        self._jtis = set()
+        self._lock = threading.Lock()
+        self.refresh()
+        threading.Thread(
+            target=self._refresh_loop, name="auth-revoked-refresh", daemon=True
+        ).start()
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._jtis
+
+    def add(self, jtis):
+        with self._lock:
+            self._jtis.update(jtis)
+
+    def refresh(self):
+        """Reload the revoked jti set from the sessions table"""
+        try:
+            with self._lock:
+                with self._sessionmaker() as session:
+                    rows = (
+                        session.query(Session.token_jti)
+                        .filter(
+                            Session.is_revoked.is_(True),
+                            Session.expires_at > datetime.utcnow(),
+                        )
+                        .all()
+                    )
+                self._jtis = {jti for (jti,) in rows}
+        except Exception as e:
+            logger.exception("Error loading revoked tokens: %s", e)
+
+    def _checkpoint_wal(self):
+        """Copy committed WAL pages into the database without blocking writers"""
+        try:
+            with self._engine.connect() as conn:
+                conn.exec_driver_sql("PRAGMA wal_checkpoint(PASSIVE)")
+        except Exception as e:
+            logger.exception("Error checkpointing WAL: %s", e)
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(Config.REVOKED_TOKENS_REFRESH_SECONDS)
+            self.refresh()
+            if self._engine.dialect.name == "sqlite":
+                self._checkpoint_wal()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_revoked_tokens(db_url: str) -> _RevokedTokens:
+    """Create the revoked-token set and its refresher once per database URL"""
+    return _RevokedTokens(_get_engine(db_url))
+
 
 class AuthService:
     """JWT-based authentication service with SQLite user storage"""
@@ -20,107 +125,254 @@ class AuthService:
         self.secret_key = Config.JWT_SECRET_KEY
         self.algorithm = Config.JWT_ALGORITHM
         self.token_expiry_hours = Config.JWT_EXPIRY_HOURS
-        self.engine = create_engine(db_url, connect_args={"check_same_thread": False})
-        Base.metadata.create_all(self.engine)
-        self.Session = sessionmaker(bind=self.engine)
+        self.engine = _get_engine(db_url)
+        # Results are copied into dicts, so committed instances never need
+        # to be reloaded from the database
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+        # RFC 9106 second recommended option (19 MiB, 2 passes)
+        self._password_hasher = PasswordHasher(
+            time_cost=2, memory_cost=19456, parallelism=1
+        )
+
+        # Recently verified logins, so repeated logins skip password hashing
+        # (Argon2id, or legacy bcrypt). Keys are an HMAC of email:password
+        # under a per-process random key, so the cache holds nothing that can
+        # be checked against a password offline.
+        self._credential_cache = TTLCache(
+            maxsize=10000, ttl=Config.CREDENTIAL_CACHE_TTL_SECONDS
+        )
+        self._credential_cache_lock = threading.RLock()
+        self._credential_cache_key_secret = secrets.token_bytes(32)
+
+        # Verified token payloads keyed by sha256(token), stored as (exp, data).
+        # An entry expires after TOKEN_CACHE_TTL_SECONDS or at the token's own
+        # exp, whichever comes first. Revocations through this service evict
+        # immediately; revocations by another process show up after the TTL.
+        self._token_cache = TLRUCache(
+            maxsize=10000,
+            ttu=lambda _key, value, now: min(
+                now + Config.TOKEN_CACHE_TTL_SECONDS, value[0]
+            ),
+            timer=time.time,
+        )
+        self._token_cache_lock = threading.RLock()
+
+        # Revoked jti set for this database, shared with every other
+        # AuthService on it; verify_token checks it instead of querying the
+        # sessions table
+        self._revoked_tokens = _get_revoked_tokens(db_url)
 
     def hash_password(self, password: str) -> str:
-        """Hash password using bcrypt"""
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+        """Hash password using Argon2id"""
+        with _HASH_SLOTS:
+            return self._password_hasher.hash(password)
 
     def verify_password(self, password: str, hashed: str) -> bool:
-        """Verify password against hash"""
-        return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+        """Verify password against an Argon2id hash or a legacy bcrypt hash"""
+        with _HASH_SLOTS:
+            if not hashed.startswith("$argon2"):
+                return self._verify_bcrypt_password(password, hashed)
+            try:
+                return self._password_hasher.verify(hashed, password)
+            except (VerifyMismatchError, InvalidHashError):
+                return False
+
+    @staticmethod
+    def _verify_bcrypt_password(password: str, hashed: str) -> bool:
+        """Verify a bcrypt hash, pre-hashed with SHA-256 or from before that"""
+        hashed_bytes = hashed.encode("utf-8")
+        prehashed = hashlib.sha256(password.encode("utf-8")).hexdigest()
+        return bcrypt.checkpw(prehashed.encode("ascii"), hashed_bytes) or (
+            bcrypt.checkpw(password.encode("utf-8"), hashed_bytes)
+        )
+
+    def password_needs_rehash(self, hashed: str) -> bool:
+        """Whether a stored hash should be replaced on the next successful login"""
+        if not hashed.startswith("$argon2"):
+            return True
+        return self._password_hasher.check_needs_rehash(hashed)
+
+    def _credential_cache_key(self, email: str, password: str) -> bytes:
+        return hmac.new(
+            self._credential_cache_key_secret,
+            f"{email}:{password}".encode("utf-8"),
+            hashlib.sha256,
+        ).digest()
 
-    def create_user(self, email, password, plan="trial"):
+    def _invalidate_credentials(self, user_id: int):
+        """Drop cached logins for a user so the next login is fully verified"""
+        with self._credential_cache_lock:
+            for key, cached in list(self._credential_cache.items()):
+                if cached["id"] == user_id:
+                    self._credential_cache.pop(key, None)
+
+    def authenticate_user(self, email: str, password: str) -> Optional[Dict[str, Any]]:
+        """Authenticate user and return user data"""
         try:
+            cache_key = self._credential_cache_key(email, password)
+            with self._credential_cache_lock:
+                cached = self._credential_cache.get(cache_key)
+            if cached is not None:
+                with self.Session() as session:
+                    session.query(User).filter_by(id=cached["id"]).update(
+                        {"last_login": datetime.utcnow()}, synchronize_session=False
+                    )
+                    session.commit()
+                return dict(cached)
+
             with self.Session() as session:
-                if session.query(User).filter_by(email=email).first():
+                user = session.query(User).filter_by(email=email).first()
+                if not user or not self.verify_password(password, user.password_hash):
                     return None
-                password_hash = self.hash_password(password)
-                user = User(
-                    email=email,
-                    password_hash=password_hash,
-                    plan=plan,
-                    created_at=datetime.utcnow(),
-                )
-                session.add(user)
-                session.commit()
+                if self.password_needs_rehash(user.password_hash):
+                    user.password_hash = self.hash_password(password)
+                user.last_login = datetime.utcnow()
+                # One SELECT plus one UPDATE; no refresh query afterwards
                 user_data = {
                     "id": user.id,
                     "email": user.email,
                     "plan": user.plan,
                     "created_at": user.created_at,
+                    "premium_start_date": user.premium_start_date,
                 }
-                return user_data
+                session.commit()
+            with self._credential_cache_lock:
+                self._credential_cache[cache_key] = dict(user_data)
+            return user_data
         except Exception as e:
-            logger.error(f"Error creating user: {e}")
+            logger.exception("Error authenticating user: %s", e)
             return None
 
-    def authenticate_user(self, email: str, password: str) -> Optional[Dict[str, Any]]:
-        """Authenticate user and return user data"""
+    def _encode_token(self, user_data: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Build and sign a token payload for user, returning (token, payload)"""
+        # POSIX seconds, which is what jwt.encode would convert datetimes to
+        now = int(time.time())
+        payload = {
+            "user_id": user_data["id"],
+            "email": user_data["email"],
+            "plan": user_data["plan"],
+            "iat": now,
+            "exp": now + self.token_expiry_hours * 3600,
+            "jti": secrets.token_urlsafe(16),  # Unique token ID
+        }
+        token = jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
+        return token, payload
+
+    def _cache_issued_token(self, token: str, payload: Dict[str, Any]):
+        """Freshly issued and not revoked, so the first verify_token can skip
+        the decode and the revocation lookup"""
+        self._cache_token(
+            token,
+            payload["exp"],
+            {
+                "user_id": payload["user_id"],
+                "email": payload["email"],
+                "plan": payload["plan"],
+                "jti": payload["jti"],
+            },
+        )
+
+    def create_user_with_token(
+        self, email: str, password: str, plan: str = "trial"
+    ) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Create a user and its first token in one transaction.
+
+        Returns (user_data, token), or None if the email is already taken.
+        """
         try:
             with self.Session() as session:
-                user = session.query(User).filter_by(email=email).first()
-                if not user or not self.verify_password(password, user.password_hash):
+                if session.query(User).filter_by(email=email).first():
                     return None
-                user.last_login = datetime.utcnow()
-                session.commit()
+                now = datetime.utcnow()
+                user = User(
+                    email=email,
+                    password_hash=self.hash_password(password),
+                    plan=plan,
+                    created_at=now,
+                    # Premium expiry is measured from this date at login
+                    premium_start_date=now if plan == Plan.PREMIUM.value else None,
+                )
+                session.add(user)
+                session.flush()
                 user_data = {
                     "id": user.id,
                     "email": user.email,
                     "plan": user.plan,
                     "created_at": user.created_at,
-                    "premium_start_date": user.premium_start_date,
                 }
-                return user_data
+                token, payload = self._encode_token(user_data)
+                session.add(
+                    Session(
+                        user_id=user.id,
+                        token_jti=payload["jti"],
+                        expires_at=datetime.utcfromtimestamp(payload["exp"]),
+                        is_revoked=False,
+                    )
+                )
+                session.commit()
+            self._cache_issued_token(token, payload)
+            return user_data, token
         except Exception as e:
-            logger.error(f"Error authenticating user: {e}")
+            logger.exception("Error creating user: %s", e)
             return None
 
     def generate_token(self, user_data: Dict[str, Any]) -> str:
         """Generate JWT token for user"""
         try:
-            now = datetime.utcnow()
-            payload = {
-                "user_id": user_data["id"],
-                "email": user_data["email"],
-                "plan": user_data["plan"],
-                "iat": now,
-                "exp": now + timedelta(hours=self.token_expiry_hours),
-                "jti": f"{user_data['id']}_{now.timestamp()}",  # Unique token ID
-            }
-
-            token = jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
+            token, payload = self._encode_token(user_data)
 
-            # Store token in database for potential revocation
-            self._store_token(user_data["id"], payload["jti"], payload["exp"])
+            # Store token in database for potential revocation; a token without
+            # a session row could never be revoked, so do not issue it
+            if not self._store_token(user_data["id"], payload["jti"], payload["exp"]):
+                raise RuntimeError("Failed to store token session")
+            self._cache_issued_token(token, payload)
 
             return token
 
         except Exception as e:
-            logger.error(f"Error generating token: {e}")
+            logger.exception("Error generating token: %s", e)
             raise
 
-    def _store_token(self, user_id: int, jti: str, expires_at: datetime):
+    def _store_token(self, user_id: int, jti: str, exp: int) -> bool:
         """Store token in database"""
         try:
             with self.Session() as session:
                 session_obj = Session(
                     user_id=user_id,
                     token_jti=jti,
-                    expires_at=expires_at,
+                    expires_at=datetime.utcfromtimestamp(exp),
                     is_revoked=False,
                 )
                 session.add(session_obj)
                 session.commit()
+            return True
         except Exception as e:
-            logger.error(f"Error storing token: {e}")
+            logger.exception("Error storing token: %s", e)
+            return False
+
+    @staticmethod
+    def _token_cache_key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def _cache_token(self, token: str, exp: float, token_data: Dict[str, Any]):
+        with self._token_cache_lock:
+            self._token_cache[self._token_cache_key(token)] = (exp, dict(token_data))
+
+    def _evict_tokens(self, field: str, value: Any):
+        """Drop cached token payloads whose `field` equals `value`"""
+        with self._token_cache_lock:
+            for key, (_exp, cached) in list(self._token_cache.items()):
+                if cached[field] == value:
+                    self._token_cache.pop(key, None)
 
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Verify JWT token and return user data"""
         try:
+            with self._token_cache_lock:
+                entry = self._token_cache.get(self._token_cache_key(token))
+            if entry is not None:
+                return dict(entry[1])
+
             # Decode token
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
 
@@ -128,33 +380,31 @@ class AuthService:
             if self._is_token_revoked(payload["jti"]):
                 return None
 
-            return {
+            token_data = {
                 "user_id": payload["user_id"],
                 "email": payload["email"],
                 "plan": payload["plan"],
                 "jti": payload["jti"],
             }
+            self._cache_token(token, payload["exp"], token_data)
+            return token_data
 
         except jwt.ExpiredSignatureError:
             logger.warning("Token has expired")
             return None
         except jwt.InvalidTokenError as e:
-            logger.warning(f"Invalid token: {e}")
+            logger.warning("Invalid token: %s", e)
             return None
         except Exception as e:
-            logger.error(f"Error verifying token: {e}")
+            logger.exception("Error verifying token: %s", e)
             return None
 
+    def _mark_revoked(self, jtis):
+        self._revoked_tokens.add(jtis)
+
     def _is_token_revoked(self, jti: str) -> bool:
         """Check if token is revoked"""
-        try:
-            with self.Session() as session:
-                session_obj = session.query(Session).filter_by(token_jti=jti).first()
-                if not session_obj or session_obj.is_revoked:
-                    return True
-        except Exception as e:
-            logger.error(f"Error checking if token is revoked: {e}")
-            return False
+        return jti in self._revoked_tokens
 
     def revoke_token(self, jti: str) -> bool:
         """Revoke a specific token"""
@@ -164,22 +414,31 @@ class AuthService:
                 if session_obj:
                     session_obj.is_revoked = True
                     session.commit()
+                    self._mark_revoked([jti])
+                    self._evict_tokens("jti", jti)
                     return True
         except Exception as e:
-            logger.error(f"Error revoking token: {e}")
+            logger.exception("Error revoking token: %s", e)
             return False
 
     def revoke_user_tokens(self, user_id: int) -> bool:
         """Revoke all tokens for a user"""
         try:
             with self.Session() as session:
-                session.query(Session).filter_by(user_id=user_id).update(
-                    {"is_revoked": True}
+                # Both statements are served by the ix_sessions_user_active
+                # partial index
+                active = session.query(Session).filter_by(
+                    user_id=user_id, is_revoked=False
                 )
+                jtis = [jti for (jti,) in active.with_entities(Session.token_jti)]
+                active.update({"is_revoked": True}, synchronize_session=False)
                 session.commit()
+            self._mark_revoked(jtis)
+            self._evict_tokens("user_id", user_id)
+            self._invalidate_credentials(user_id)
             return True
         except Exception as e:
-            logger.error(f"Error revoking user tokens: {e}")
+            logger.exception("Error revoking user tokens: %s", e)
             return False
 
     def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
@@ -199,7 +458,7 @@ class AuthService:
                 }
                 return user_data
         except Exception as e:
-            logger.error(f"Error getting user: {e}")
+            logger.exception("Error getting user: %s", e)
             return None
 
     def update_user_plan(self, user_id: int, new_plan: str) -> bool:
@@ -208,33 +467,35 @@ class AuthService:
             with self.Session() as session:
                 user = session.query(User).filter_by(id=user_id).first()
                 if not user:
-                    logger.error(f"User {user_id} does not exist")
+                    logger.error("User %s does not exist", user_id)
                     raise ValueError("User does not exist")
                 user.plan = new_plan
                 session.commit()
+            self._invalidate_credentials(user_id)
         except Exception as e:
-            logger.error(f"Error updating user plan: {e}")
+            logger.exception("Error updating user plan: %s", e)
             raise e
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     auth_service = AuthService()
 
     email = "test@example.com"
     password = "password"
-    user = auth_service.create_user(email, password)
-    if user:
-        logger.info(f"User created: {user}")
+    created = auth_service.create_user_with_token(email, password)
+    if created:
+        logger.info("User created: %s", created[0])
     else:
         logger.warning("User already exists")
     auth_user = auth_service.authenticate_user(email, password)
     if auth_user:
-        logger.info(f"User authenticated: {auth_user}")
+        logger.info("User authenticated: %s", auth_user)
         token = auth_service.generate_token(auth_user)
-        logger.info(f"Generated token: {token}")
+        logger.info("Generated token: %s", token)
 
         verified_data = auth_service.verify_token(token)
         if verified_data:
-            logger.info(f"Token verified: {verified_data}")
+            logger.info("Token verified: %s", verified_data)
         else:
             logger.warning("Token verification failed")
@@ -3,7 +3,6 @@ import numpy as np
 import speech_recognition as sr
 import logging
 from typing import Optional, Callable
-from collections import deque
 
 logger = logging.getLogger(__name__)
 
@@ -22,15 +21,29 @@ class StreamingSpeechService:
         vad_min_utterance_ms: int = 300,
         vad_max_utterance_ms: int = 15000,
         vad_rms_threshold: float = 300.0,
+        queue_size_ms: int = 5000,
     ):
         self.sample_rate = sample_rate
         self.chunk_size = chunk_size
         self.language = language
 
-        # Audio buffer for streaming (utterance-level; unlimited, we flush via VAD)
-        self.audio_buffer = deque()
+        # Utterance buffer, preallocated for the longest utterance VAD allows;
+        # current_utterance_samples is the write position
+        self.audio_buffer = np.empty(
+            int(sample_rate * vad_max_utterance_ms / 1000) + chunk_size, dtype=np.int16
+        )
         self.is_recording = False
+        # Finished utterances waiting for recognition, in arrival order; None
+        # tells the transcription worker to stop. Its queued samples are
+        # bounded by queue_size_ms as well (see _flush_utterance)
+        self.utterance_queue = asyncio.Queue()
+        self._queued_utterance_samples = 0
+        # Bounded by queued samples (producers push chunks of varying length,
+        # e.g. 320-sample WebRTC frames) so a recognition stall drops stale
+        # audio beyond queue_size_ms instead of building an ever-growing backlog
         self.audio_queue = asyncio.Queue()
+        self._queued_samples = 0
+        self._max_queued_samples = int(queue_size_ms * sample_rate / 1000)
 
         # Speech recognition setup
         self.recognizer = sr.Recognizer()
@@ -44,6 +57,8 @@ class StreamingSpeechService:
         self.vad_max_utterance_ms = vad_max_utterance_ms
         # Simple RMS threshold for voiced/unvoiced decision (int16 amplitude)
         self.vad_rms_threshold = vad_rms_threshold
+        # Compared against mean square so the hot path needs no sqrt
+        self._vad_threshold_sq = vad_rms_threshold**2
 
         # Runtime VAD state
         self.current_utterance_samples = 0
@@ -60,38 +75,89 @@ class StreamingSpeechService:
         """Start the streaming recognition service"""
         self.is_recording = True
         self.recognition_task = asyncio.create_task(self._recognition_worker())
+        self.transcription_task = asyncio.create_task(self._transcription_worker())
         logger.info("Streaming speech recognition started")
 
-    async def stop_streaming(self):
-        """Stop the streaming recognition service"""
+    async def stop_streaming(self, discard: bool = False):
+        """Stop the streaming recognition service.
+
+        By default queued audio is still recognized; with discard (the client
+        is gone) pending audio and utterances are dropped instead.
+        """
+        if not self.is_recording:
+            return
         self.is_recording = False
+        if discard:
+            # Nobody will receive the results; do not spend recognition calls
+            # on them
+            tasks = [t for t in (self.recognition_task, self.transcription_task) if t]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._reset_queues()
+            logger.info("Streaming speech recognition stopped; pending audio dropped")
+            return
+        # Queued after any pending audio, so everything before it is processed
+        await self.audio_queue.put(None)
         if self.recognition_task:
             await self.recognition_task
+        if self.transcription_task:
+            await self.transcription_task
         logger.info("Streaming speech recognition stopped")
 
+    def _reset_queues(self):
+        """Drop queued audio and utterances and reset VAD state"""
+        self.audio_queue = asyncio.Queue()
+        self._queued_samples = 0
+        self.utterance_queue = asyncio.Queue()
+        self._queued_utterance_samples = 0
+        self.current_utterance_samples = 0
+        self.current_silence_ms = 0
+
     async def add_audio_chunk(self, audio_chunk: np.ndarray):
         """Add audio chunk to the streaming buffer"""
         if self.is_recording:
-            await self.audio_queue.put(audio_chunk)
+            self.audio_queue.put_nowait(audio_chunk)
+            self._queued_samples += audio_chunk.size
+            if self._queued_samples > self._max_queued_samples:
+                # Drop the oldest chunks to keep latency bounded
+                while self._queued_samples > self._max_queued_samples:
+                    self._queued_samples -= self.audio_queue.get_nowait().size
+                logger.warning("Audio backlog full, dropped oldest audio")
+
+    def _append_audio(self, samples: np.ndarray):
+        """Copy samples into the utterance buffer, growing it if needed"""
+        start = self.current_utterance_samples
+        end = start + len(samples)
+        if end > len(self.audio_buffer):
+            grown = np.empty(max(end, 2 * len(self.audio_buffer)), dtype=np.int16)
+            grown[:start] = self.audio_buffer[:start]
+            self.audio_buffer = grown
+        self.audio_buffer[start:end] = samples
+        self.current_utterance_samples = end
 
     async def _recognition_worker(self):
         """Background worker for continuous recognition"""
-        while self.is_recording:
+        while True:
+            # get() returns immediately while a backlog is queued; None is the
+            # stop sentinel from stop_streaming
+            audio_chunk = await self.audio_queue.get()
+            if audio_chunk is None:
+                break
+            self._queued_samples -= audio_chunk.size
             try:
-                # Get audio chunk from queue with a timeout
-                audio_chunk = await asyncio.wait_for(
-                    self.audio_queue.get(), timeout=0.1
-                )
-
-                # Add to utterance buffer
-                flat = audio_chunk.flatten()
-                self.audio_buffer.extend(flat)
-                self.current_utterance_samples += len(flat)
-
-                # Compute simple RMS to detect speech vs silence
-                rms = float(np.sqrt(np.mean(flat.astype(np.float32) ** 2)))
+                # Add to utterance buffer; frames arrive as (channels, samples)
+                # so take a 1-D view rather than a flatten() copy
+                flat = audio_chunk.reshape(-1)
+                self._append_audio(flat)
+
+                # Compare mean square energy to detect speech vs silence; one
+                # exact int64 dot product replaces the float32 cast, square
+                # and mean temporaries (about 3x faster per chunk)
+                wide = flat.astype(np.int64)
+                mean_sq = int(np.dot(wide, wide)) / max(len(flat), 1)
                 chunk_ms = int(1000 * len(flat) / self.sample_rate)
-                if rms >= self.vad_rms_threshold:
+                if mean_sq >= self._vad_threshold_sq:
                     # voiced
                     self.current_silence_ms = 0
                 else:
@@ -104,51 +170,76 @@ class StreamingSpeechService:
                     self.current_silence_ms >= self.vad_silence_ms
                     and utterance_ms >= self.vad_min_utterance_ms
                 ) or utterance_ms >= self.vad_max_utterance_ms:
-                    await self._process_audio_buffer()
+                    self._flush_utterance()
 
-            except asyncio.TimeoutError:
-                # Continue to check if recording has stopped
-                continue
             except Exception as e:
-                logger.error(f"Error in recognition worker: {e}")
+                logger.exception("Error in recognition worker: %s", e)
 
-        # Process any remaining audio in the queue
-        while not self.audio_queue.empty():
-            audio_chunk = self.audio_queue.get_nowait()
-            self.audio_buffer.extend(audio_chunk.flatten())
+        # Flush the trailing audio only if it is long enough to be speech
+        min_samples = self.vad_min_utterance_ms * self.sample_rate / 1000
+        if self.current_utterance_samples >= min_samples:
+            self._flush_utterance()
+        else:
+            self.current_utterance_samples = 0
+            self.current_silence_ms = 0
+        self.utterance_queue.put_nowait(None)
+
+    def _flush_utterance(self):
+        """Queue the buffered utterance for recognition and reset VAD state"""
+        if self.current_utterance_samples > 0:
+            # Copy out, since the buffer is reused for the next utterance
+            utterance = self.audio_buffer[: self.current_utterance_samples].copy()
+            self.utterance_queue.put_nowait(utterance)
+            self._queued_utterance_samples += utterance.size
+            # Recognition is falling behind; drop the oldest waiting utterances
+            # but always keep the newest
+            while (
+                self._queued_utterance_samples > self._max_queued_samples
+                and self.utterance_queue.qsize() > 1
+            ):
+                dropped = self.utterance_queue.get_nowait()
+                self._queued_utterance_samples -= dropped.size
+                logger.warning("Recognition backlog full, dropped oldest utterance")
+        self.current_utterance_samples = 0
+        self.current_silence_ms = 0
 
-        # Process the final buffer if there's anything in it
-        if len(self.audio_buffer) > 0:
-            await self._process_audio_buffer()
+    async def _transcription_worker(self):
+        """Background worker that recognizes queued utterances in order"""
+        while True:
+            audio_data = await self.utterance_queue.get()
+            if audio_data is None:
+                break
+            self._queued_utterance_samples -= audio_data.size
+            await self._process_audio_buffer(audio_data)
 
-    async def _process_audio_buffer(self):
-        """Process the current audio buffer for recognition"""
+    async def _process_audio_buffer(self, audio_data: np.ndarray):
+        """Recognize one utterance and pass the text to the callback"""
         try:
-            # Convert buffer to numpy array
-            audio_data = np.array(list(self.audio_buffer), dtype=np.int16)
-            if audio_data.size == 0:
-                return
 
-            # Try to transcribe
-            transcribed_text = self._transcribe_audio(audio_data)
+            # Try to transcribe; recognize_google blocks on HTTP, so run it in
+            # the default executor
+            loop = asyncio.get_running_loop()
+            transcribed_text = await loop.run_in_executor(
+                None, self._transcribe_audio, audio_data
+            )
+            # Whitespace-only results would cost a translation and TTS round
+            # trip for nothing
+            transcribed_text = (transcribed_text or "").strip()
             if transcribed_text:
                 # Call callbacks
                 if self.on_transcription:
                     await self.on_transcription(transcribed_text)
 
         except Exception as e:
-            logger.error(f"Error processing audio buffer: {e}")
-        finally:
-            # Clear buffer and reset VAD state after processing
-            self.audio_buffer.clear()
-            self.current_utterance_samples = 0
-            self.current_silence_ms = 0
+            logger.exception("Error processing audio buffer: %s", e)
 
     def _transcribe_audio(self, audio_data: np.ndarray) -> Optional[str]:
         """Transcribe audio data"""
         try:
-            # Ensure audio data is in 16-bit format
-            audio_data = audio_data.astype(np.int16)
+            # Ensure audio data is in 16-bit format; the utterance buffer
+            # already is, so this normally costs nothing
+            if audio_data.dtype != np.int16:
+                audio_data = audio_data.astype(np.int16, copy=False)
 
             audio_bytes = audio_data.tobytes()
             audio_data_sr = sr.AudioData(audio_bytes, self.sample_rate, 2)
@@ -161,9 +252,9 @@ class StreamingSpeechService:
             return None
         except sr.RequestError as e:
             logger.error(
-                f"Could not request results from speech recognition service: {e}"
+                "Could not request results from speech recognition service: %s", e
             )
             return None
         except Exception as e:
-            logger.error(f"Error transcribing audio: {e}")
+            logger.exception("Error transcribing audio: %s", e)
             return None
@@ -1,14 +1,19 @@
+import asyncio
 import google.generativeai as genai
-from typing import Optional
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
 import logging
 from src.utils.config import Config
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class _RequestAbandoned(Exception):
+    """Set on a shared Gemini request whose owning caller was cancelled"""
+
+
 class TranslationService:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_size: int = 1024):
         """
         Initialize the translation service with Gemini API
         """
@@ -16,25 +21,101 @@ class TranslationService:
             raise ValueError("Gemini API key is required")
 
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(Config.TRANSLATION_SERVICE_MODEL)
+        # One model per direction so the instructions travel as a system
+        # instruction and each request carries only the text
+        self._zh_en_model = genai.GenerativeModel(
+            Config.TRANSLATION_SERVICE_MODEL,
+            system_instruction=Config.ZH_TO_EN_INSTRUCTION,
+        )
+        self._en_zh_model = genai.GenerativeModel(
+            Config.TRANSLATION_SERVICE_MODEL,
+            system_instruction=Config.EN_TO_ZH_INSTRUCTION,
+        )
+
+        # LRU of recent translations keyed by (source language, stripped text)
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._cache_max = cache_size
+        # Gemini calls in progress; concurrent requests for the same key await
+        # the same future. Bounded by the number of concurrent callers.
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
         logger.info("Translation service initialized with Gemini API")
 
+    @staticmethod
+    def _cache_key(source_language: str, text: str) -> Tuple[str, str]:
+        # Only surrounding whitespace is normalized; casing can change the
+        # meaning ("US" vs "us"), so it is part of the key
+        return source_language, text.strip()
+
+    def _cache_get(self, key: Tuple[str, str]) -> Optional[str]:
+        translation = self._cache.get(key)
+        if translation is not None:
+            self._cache.move_to_end(key)
+        return translation
+
+    def _cache_put(self, key: Tuple[str, str], translation: str):
+        self._cache[key] = translation
+        self._cache.move_to_end(key)
+        if len(self._cache) > self._cache_max:
+            self._cache.popitem(last=False)
+
+    async def _generate_translation(
+        self, model: genai.GenerativeModel, cache_key: Tuple[str, str], text: str
+    ) -> str:
+        """Call Gemini for text, sharing one request between duplicate callers"""
+        while True:
+            pending = self._inflight.get(cache_key)
+            if pending is None:
+                break
+            try:
+                # shield: a cancelled waiter must not cancel the shared request
+                return await asyncio.shield(pending)
+            except _RequestAbandoned:
+                # The owner was cancelled, not us; issue the request ourselves
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            response = await model.generate_content_async(text)
+            translation = response.text.strip()
+            self._cache_put(cache_key, translation)
+            future.set_result(translation)
+            return translation
+        except asyncio.CancelledError:
+            # Cancelling the future would raise CancelledError in every
+            # waiter's task; tell them to retry instead
+            future.set_exception(_RequestAbandoned())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a future without waiters is not reported
+            future.exception()
+            raise
+        finally:
+            del self._inflight[cache_key]
+
     async def translate_zh_to_en(self, chinese_text: str) -> Optional[str]:
         """
         Translate Chinese text to English
         """
         try:
-            prompt = Config.ZH_TO_EN_PROMPT.format(text=chinese_text)
-            logger.info(f"Translating Chinese to English: {chinese_text}")
+            cache_key = self._cache_key(Config.LANGUAGE_ZH, chinese_text)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
 
-            response = await self.model.generate_content_async(prompt)
-            translation = response.text.strip()
+            logger.info("Translating Chinese to English: %s", chinese_text)
+
+            translation = await self._generate_translation(
+                self._zh_en_model, cache_key, chinese_text
+            )
 
-            logger.info(f"Translation successful: {translation}")
+            logger.info("Translation successful: %s", translation)
             return translation
 
         except Exception as e:
-            logger.error(f"Error translating Chinese to English: {e}")
+            logger.exception("Error translating Chinese to English: %s", e)
             return None
 
     async def translate_en_to_zh(self, english_text: str) -> Optional[str]:
@@ -42,17 +123,22 @@ class TranslationService:
         Translate English text to Chinese
         """
         try:
-            prompt = Config.EN_TO_ZH_PROMPT.format(text=english_text)
-            logger.info(f"Translating English to Chinese: {english_text}")
+            cache_key = self._cache_key(Config.LANGUAGE_EN, english_text)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
 
-            response = await self.model.generate_content_async(prompt)
-            translation = response.text.strip()
+            logger.info("Translating English to Chinese: %s", english_text)
+
+            translation = await self._generate_translation(
+                self._en_zh_model, cache_key, english_text
+            )
 
-            logger.info(f"Translation successful: {translation}")
+            logger.info("Translation successful: %s", translation)
             return translation
 
         except Exception as e:
-            logger.error(f"Error translating English to Chinese: {e}")
+            logger.exception("Error translating English to Chinese: %s", e)
             return None
 
     async def translate(self, text: str, source_language: str) -> Optional[str]:
@@ -60,24 +146,23 @@ class TranslationService:
         Automatically translate text based on detected source language
         """
         try:
-            if source_language == "zh-CN":
+            if source_language == Config.LANGUAGE_ZH:
                 return await self.translate_zh_to_en(text)
-            elif source_language == "en-US":
+            elif source_language == Config.LANGUAGE_EN:
                 return await self.translate_en_to_zh(text)
             else:
-                logger.error(f"Unsupported source language: {source_language}")
+                logger.error("Unsupported source language: %s", source_language)
                 return None
 
         except Exception as e:
-            logger.error(f"Error in auto translation: {e}")
+            logger.exception("Error in auto translation: %s", e)
             return None
 
     async def batch_translate(self, texts: list, source_language: str) -> list:
         """
         Translate multiple texts in batch
         """
-        translations = []
-        for text in texts:
-            translation = await self.translate(text, source_language)
-            translations.append(translation)
-        return translations
+        # Concurrent requests; results keep the order of texts
+        return list(
+            await asyncio.gather(*(self.translate(t, source_language) for t in texts))
+        )
@@ -1,35 +1,86 @@
+import atexit
+import io
 import pyttsx3
 import tempfile
+import threading
 import os
-from typing import Optional
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
 import logging
-import base64
 import pythoncom
 
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# pyttsx3 can only synthesize to a file; where a RAM-backed tmpfs exists, put
+# the temporary WAV there so the round trip never touches disk
+_TEMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def _remove_file(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
 
 class TTSService:
+    # Voice id per language (None if the driver has no match), shared by all
+    # instances and threads so the driver's voice list is enumerated once per
+    # language per process
+    _voice_ids: Dict[str, Optional[str]] = {}
+    _voice_ids_lock = threading.Lock()
+
+    def __init__(self, cache_size: int = 128):
+        # Recently synthesized WAV bytes keyed by (language, text); repeated
+        # phrases skip the engine entirely
+        self._audio_cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._audio_cache_max = cache_size
+        self._audio_cache_lock = threading.Lock()
+        # Syntheses in progress; concurrent callers for the same key wait on
+        # the event and then read the cache
+        self._pending: Dict[Tuple[str, str], threading.Event] = {}
+
+        # One long-lived engine per worker thread
+        self._local = threading.local()
+
+    def _voice_id(self, engine, language: str) -> Optional[str]:
+        """Returns the id of the first installed voice matching language."""
+        try:
+            return self._voice_ids[language]
+        except KeyError:
+            pass
+        with self._voice_ids_lock:
+            if language not in self._voice_ids:
+                if language == Config.LANGUAGE_ZH:
+                    keywords = ("chinese", "mandarin")
+                else:
+                    keywords = ("english",)
+                self._voice_ids[language] = next(
+                    (
+                        voice.id
+                        for voice in engine.getProperty("voices")
+                        if any(k in voice.name.lower() for k in keywords)
+                    ),
+                    None,
+                )
+            return self._voice_ids[language]
+
     def _initialize_engine(self, language: str = "en"):
-        """Initializes and configures a new pyttsx3 engine."""
-        engine = pyttsx3.init()
+        """Returns this thread's pyttsx3 engine, configured for language."""
+        engine = getattr(self._local, "engine", None)
+        if engine is None:
+            # SAPI5 is apartment-threaded, so COM is initialized and an engine
+            # built once per thread. pyttsx3.init() would hand every thread
+            # the same cached engine, hence the direct Engine().
+            pythoncom.CoInitialize()
+            engine = self._local.engine = pyttsx3.Engine()
 
         # Set appropriate voice based on language
-        voices = engine.getProperty("voices")
-        if language == "zh-CN":
-            for voice in voices:
-                if "chinese" in voice.name.lower() or "mandarin" in voice.name.lower():
-                    engine.setProperty("voice", voice.id)
-                    break
-            engine.setProperty("rate", 130)
-        else:
-            for voice in voices:
-                if "english" in voice.name.lower():
-                    engine.setProperty("voice", voice.id)
-                    break
-            engine.setProperty("rate", 150)
+        voice_id = self._voice_id(engine, language)
+        if voice_id:
+            engine.setProperty("voice", voice_id)
+        engine.setProperty("rate", 130 if language == Config.LANGUAGE_ZH else 150)
 
         engine.setProperty("volume", 0.9)
         return engine
@@ -37,18 +88,44 @@ class TTSService:
     def save_audio_in_memory(self, text: str, language: str = "en") -> Optional[bytes]:
         """
         Generate TTS audio and return it as a audio bytes (WAV format).
-        This method is thread-safe by creating a new engine for each call.
+        This method is thread-safe; results are cached per (language, text).
         """
-        pythoncom.CoInitialize()
-        temp_filename = ""
+        key = (language, text)
+        while True:
+            with self._audio_cache_lock:
+                cached = self._audio_cache.get(key)
+                if cached is not None:
+                    self._audio_cache.move_to_end(key)
+                    return cached
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Event()
+                    break
+            # Another thread is synthesizing this phrase; on failure its
+            # entry is gone and the next pass synthesizes here instead
+            pending.wait()
+
         try:
-            engine = self._initialize_engine(language)
+            audio_bytes = self._synthesize(text, language)
+            if audio_bytes is not None:
+                with self._audio_cache_lock:
+                    self._audio_cache[key] = audio_bytes
+                    if len(self._audio_cache) > self._audio_cache_max:
+                        self._audio_cache.popitem(last=False)
+            return audio_bytes
+        finally:
+            with self._audio_cache_lock:
+                del self._pending[key]
+            pending.set()
 
-            # Create a temporary file that pyttsx3 can write to
-            with tempfile.NamedTemporaryFile(
-                suffix=".wav", delete=False
-            ) as temp_audio_file:
-                temp_filename = temp_audio_file.name
+    def _synthesize(self, text: str, language: str) -> Optional[bytes]:
+        """
+        Run the engine for text and return the WAV bytes.
+        This method is thread-safe; each thread reuses its own engine.
+        """
+        try:
+            engine = self._initialize_engine(language)
+            temp_filename = self._temp_path()
 
             engine.save_to_file(text, temp_filename)
             engine.runAndWait()
@@ -60,28 +137,63 @@ class TTSService:
             with open(temp_filename, "rb") as f:
                 audio_bytes = f.read()
 
-            # audio_base64 = base64.b64encode(audio_bytes).decode("utf-8")
-            return audio_bytes
+            # Empty means the engine wrote nothing this time
+            return audio_bytes or None
         except Exception as e:
-            logger.error(f"Error saving audio to memory: {e}")
+            logger.exception("Error saving audio to memory: %s", e)
             return None
-        finally:
-            # Clean up the temporary file
-            if temp_filename and os.path.exists(temp_filename):
-                os.unlink(temp_filename)
 
-    def speak_text(self, text: str, language: str = "en") -> bool:
+    def _temp_path(self) -> str:
+        """Returns this thread's scratch WAV path, emptied for the next synthesis.
+
+        The file is created once per thread and reused, so each synthesis
+        overwrites one inode instead of creating and deleting a file.
+        """
+        path = getattr(self._local, "temp_path", None)
+        if path is not None:
+            try:
+                # Never hand back the previous utterance if the engine fails;
+                # opening for writing empties the file, and recreates it if a
+                # tmp cleaner removed it
+                open(path, "wb").close()
+                return path
+            except OSError as e:
+                logger.warning("Scratch WAV %s unusable, creating another: %s", path, e)
+                self._local.temp_path = None
+        with tempfile.NamedTemporaryFile(
+            suffix=".wav", dir=_TEMP_DIR, delete=False
+        ) as temp_audio_file:
+            path = self._local.temp_path = temp_audio_file.name
+        atexit.register(_remove_file, path)
+        return path
+
+    def speak_text(
+        self, text: str, language: str = "en", blocking: bool = False
+    ) -> bool:
         """
         Convert text to speech and play it.
+        Returns once playback has started unless blocking is set; call
+        sounddevice.wait() to wait for it later.
         """
         try:
-            logger.info(f"Speaking text in {language}: {text}")
-            engine = self._initialize_engine(language)
-            engine.say(text)
-            engine.runAndWait()
-            engine.stop()
-            logger.info("Speech completed successfully")
+            # Imported here so the server, which never plays audio locally,
+            # does not need PortAudio installed
+            import sounddevice as sd
+            import soundfile as sf
+        except (ImportError, OSError) as e:
+            # sounddevice raises OSError when the PortAudio library is missing
+            logger.error("Audio playback unavailable: %s", e)
+            return False
+
+        try:
+            logger.info("Speaking text in %s: %s", language, text)
+            audio_bytes = self.save_audio_in_memory(text, language)
+            if not audio_bytes:
+                return False
+            data, samplerate = sf.read(io.BytesIO(audio_bytes), dtype="float32")
+            sd.play(data, samplerate, blocking=blocking)
+            logger.info("Speech playback started")
             return True
         except Exception as e:
-            logger.error(f"Error in text-to-speech: {e}")
+            logger.exception("Error in text-to-speech: %s", e)
             return False
@@ -11,6 +11,8 @@ class Config:
 
     LANGUAGE_ZH = os.getenv("LANGUAGE_ZH", "zh-CN")
     LANGUAGE_EN = os.getenv("LANGUAGE_EN", "en-US")
+    # Supported source language -> language it is translated into
+    TARGET_LANGUAGE = {LANGUAGE_ZH: LANGUAGE_EN, LANGUAGE_EN: LANGUAGE_ZH}
 
     SAMPLE_RATE = int(os.getenv("SAMPLE_RATE", "16000"))
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1024"))
@@ -18,11 +20,25 @@ class Config:
 
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", "8000"))
+    AUTH_PORT = int(os.getenv("AUTH_PORT", "8002"))
+    # Largest websocket message accepted (signaling JSON, base64 audio chunks)
+    MAX_WS_MESSAGE_BYTES = int(os.getenv("MAX_WS_MESSAGE_BYTES", str(1024 * 1024)))
+    # Threads dedicated to TTS synthesis (each keeps its own pyttsx3 engine)
+    TTS_WORKERS = int(os.getenv("TTS_WORKERS", "2"))
 
     # JWT Authentication settings
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     JWT_ALGORITHM = "HS256"
     JWT_EXPIRY_HOURS = int(os.getenv("JWT_EXPIRY_HOURS", "1"))
+    # How long a verified token is trusted without re-checking the database
+    TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "30"))
+    # How often each process reloads the revoked-token list from the database
+    REVOKED_TOKENS_REFRESH_SECONDS = int(
+        os.getenv("REVOKED_TOKENS_REFRESH_SECONDS", "60")
+    )
+    # How long a successful login is remembered, skipping password hashing
+    # (Argon2id, or legacy bcrypt) on repeats
+    CREDENTIAL_CACHE_TTL_SECONDS = int(os.getenv("CREDENTIAL_CACHE_TTL_SECONDS", "60"))
 
     # Optional ICE servers for WebRTC
     # Comma-separated URLs, e.g.:
@@ -33,18 +49,16 @@ class Config:
         if s.strip()
     ]
 
-    ZH_TO_EN_PROMPT = """
+    # Sent once as each model's system instruction; the text to translate is
+    # the whole of each request
+    ZH_TO_EN_INSTRUCTION = """
     You are a professional Chinese to English translator. 
-    Translate the following Chinese text to natural, fluent English. 
+    Translate the Chinese text you are given to natural, fluent English. 
     Maintain the original meaning and tone. Only return the English translation, nothing else.
-    
-    Chinese text: {text}
     """
 
-    EN_TO_ZH_PROMPT = """
+    EN_TO_ZH_INSTRUCTION = """
     You are a professional English to Chinese translator. 
-    Translate the following English text to natural, fluent Chinese. 
+    Translate the English text you are given to natural, fluent Chinese. 
     Maintain the original meaning and tone. Only return the Chinese translation, nothing else.
-    
-    English text: {text}
     """
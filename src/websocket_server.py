@@ -1,16 +1,18 @@
 import asyncio
 import websockets
-import json
 import logging
+import orjson
 import numpy as np
-import base64
-from typing import Dict, Set
+import binascii
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
 from src.service.transcription_service import StreamingSpeechService
 from src.service.translation_service import TranslationService
 from src.service.tts_service import TTSService
 from src.utils.config import Config
 from src.service.auth_service import AuthService
-from src.auth_api import Plan
+from src.model.users import Plan
 
 # WebRTC imports
 from aiortc import (
@@ -20,13 +22,85 @@ from aiortc import (
 )
 from aiortc.sdp import candidate_from_sdp
 import av
+from av.audio.resampler import AudioResampler
 from aiohttp import web
 import io
+import wave
+from fractions import Fraction
 
 
 logger = logging.getLogger(__name__)
 
 
+def _dumps(obj) -> str:
+    """Serialize obj with orjson as a text (str) message"""
+    # orjson returns bytes, which websockets and data channels would send as
+    # binary messages that the browser client cannot JSON.parse
+    return orjson.dumps(obj).decode("utf-8")
+
+
+# Constant control replies, encoded once
+_PONG = _dumps({"type": "pong"})
+_STREAMING_STARTED = _dumps({"type": "streaming_started", "status": "success"})
+_STREAMING_STOPPED = _dumps({"type": "streaming_stopped", "status": "success"})
+# Health check body, served as-is on every probe
+_HEALTH_BODY = orjson.dumps({"status": "ok"})
+
+# Outbound WebRTC audio format
+_TTS_OUT_RATE = 48000
+_TTS_OUT_TIME_BASE = Fraction(1, _TTS_OUT_RATE)
+# Outbound frames buffered per track (~20 ms each, so about 4 s of audio)
+_TTS_MAX_FRAMES = 200
+# How long enqueueing waits for the sender to free space before treating it
+# as stalled and dropping the oldest frame
+_TTS_STALL_SECONDS = 1.0
+# Log a dropped-frames warning once per this many drops
+_TTS_DROP_LOG_EVERY = 100
+
+
+class ConnectionState:
+    """Per-websocket resources, kept in one object instead of parallel dicts"""
+
+    __slots__ = (
+        "service",
+        "response_mode",
+        "out_queue",
+        "writer_task",
+        "close_task",
+        "pc",
+        "tts_track",
+        "data_channel",
+    )
+
+    def __init__(self):
+        self.service: Optional[StreamingSpeechService] = None
+        self.response_mode = "transcript_only"
+        # Outbound frames, drained by one writer task so handlers never wait
+        # on a slow client's socket
+        self.out_queue: Optional[asyncio.Queue] = None
+        self.writer_task: Optional[asyncio.Task] = None
+        # Set once the socket is being closed (slow client or failed send);
+        # held so the task is not garbage-collected and the close starts once
+        self.close_task: Optional[asyncio.Task] = None
+        # WebRTC peer connection, outbound TTS track and transcript channel
+        self.pc: Optional[RTCPeerConnection] = None
+        self.tts_track: Optional[MediaStreamTrack] = None
+        self.data_channel = None
+
+
+class _TranscriptionCallback:
+    """Per-connection transcription callback without a closure cell per websocket"""
+
+    __slots__ = ("server", "websocket")
+
+    def __init__(self, server: "StreamingTranslationServer", websocket):
+        self.server = server
+        self.websocket = websocket
+
+    async def __call__(self, transcribed_text: str):
+        await self.server._handle_transcription(self.websocket, transcribed_text)
+
+
 class StreamingTranslationServer:
     """
     WebSocket server for real-time streaming speech translation
@@ -36,35 +110,34 @@ class StreamingTranslationServer:
         self.gemini_api_key = gemini_api_key
         self.translation_service = TranslationService(gemini_api_key)
         self.tts_service = TTSService()
+        # TTS gets its own bounded pool so synthesis cannot starve other
+        # blocking work (token checks) on the default executor
+        self._tts_executor = ThreadPoolExecutor(
+            max_workers=Config.TTS_WORKERS, thread_name_prefix="tts"
+        )
         self.auth_service = AuthService()
 
-        # Active connections
-        self.active_connections: Set[websockets.WebSocketServerProtocol] = set()
-
-        # Streaming services per connection
-        self.connection_services: Dict[
-            websockets.WebSocketServerProtocol, StreamingSpeechService
-        ] = {}
-
-        # For WebRTC peer connections per websocket
-        self.ws_to_pc: Dict[websockets.WebSocketServerProtocol, RTCPeerConnection] = {}
-        self.ws_to_tts_track: Dict[
-            websockets.WebSocketServerProtocol, MediaStreamTrack
-        ] = {}
-        self.ws_to_data_channel: Dict[websockets.WebSocketServerProtocol, object] = {}
+        # JSON message type -> handler(websocket, data)
+        self._message_handlers = {
+            "audio_chunk": self._handle_audio_chunk,
+            "start_streaming": self._handle_start_streaming,
+            "stop_streaming": self._handle_stop_streaming,
+            "webrtc_offer": self._handle_webrtc_offer,
+            "webrtc_ice": self._handle_webrtc_ice,
+            "ping": self._handle_ping,
+        }
 
-        # Response mode preferences per connection
-        self.connection_response_modes: Dict[
-            websockets.WebSocketServerProtocol, str
-        ] = {}
+        # Active connections and their resources
+        self.connections: Dict[websockets.WebSocketServerProtocol, ConnectionState] = {}
 
     async def handle_connection(self, websocket):
         """Handle new WebSocket connection"""
         try:
             # Add to active connections
-            self.active_connections.add(websocket)
+            state = ConnectionState()
+            self.connections[websocket] = state
             init_msg = await websocket.recv()
-            data = json.loads(init_msg)
+            data = orjson.loads(init_msg)
 
             # JWT authentication
             token = data.get("token")
@@ -72,27 +145,38 @@ class StreamingTranslationServer:
                 await websocket.close(code=4401, reason="Unauthorized: Missing token")
                 return
 
-            user_data = self.auth_service.verify_token(token)
+            # Token verification hits SQLite; keep it off the event loop
+            loop = asyncio.get_running_loop()
+            user_data = await loop.run_in_executor(
+                None, self.auth_service.verify_token, token
+            )
             if not user_data or user_data.get("plan") == Plan.LIMITED.value:
                 await websocket.close(code=4401, reason="Unauthorized: Cannot access")
                 return
-            logger.info(f"User {user_data['email']} authenticated successfully")
+            logger.info("User %s authenticated successfully", user_data["email"])
 
-            language = data.get("language", "en-US")
+            language = data.get("language", Config.LANGUAGE_EN)
+            if language not in Config.TARGET_LANGUAGE:
+                await websocket.close(code=4400, reason="Unsupported language")
+                return
             response_mode = data.get("response_mode", "transcript_only")
 
             # Validate response_mode
             if response_mode not in ["transcript_only", "both"]:
                 response_mode = "transcript_only"
                 logger.warning(
-                    f"Invalid response_mode, defaulting to 'transcript_only': {data.get('response_mode')}"
+                    "Invalid response_mode, defaulting to 'transcript_only': %s",
+                    data.get("response_mode"),
                 )
 
             # Store response mode preference
-            self.connection_response_modes[websocket] = response_mode
+            state.response_mode = response_mode
 
             logger.info(
-                f"New connection from {websocket.remote_address} for language: {language}, response_mode: {response_mode}"
+                "New connection from %s for language: %s, response_mode: %s",
+                websocket.remote_address,
+                language,
+                response_mode,
             )
 
             # Create streaming service for this connection
@@ -107,9 +191,15 @@ class StreamingTranslationServer:
                 on_transcription=self._on_transcription(websocket)
             )
 
-            self.connection_services[websocket] = streaming_service
+            state.service = streaming_service
+
+            state.out_queue = asyncio.Queue(maxsize=256)
+            state.writer_task = asyncio.create_task(
+                self._writer_loop(websocket, state.out_queue)
+            )
             logger.info(
-                f"New WebSocket connection established. Total connections: {len(self.active_connections)}"
+                "New WebSocket connection established. Total connections: %d",
+                len(self.connections),
             )
 
             # Handle messages
@@ -119,9 +209,9 @@ class StreamingTranslationServer:
         except websockets.exceptions.ConnectionClosed:
             logger.info("WebSocket connection closed")
         except websockets.exceptions.ConnectionClosedError as e:
-            logger.error(f"WebSocket connection closed with error: {e}")
+            logger.error("WebSocket connection closed with error: %s", e)
         except Exception as e:
-            logger.error(f"Error handling WebSocket connection: {e}")
+            logger.error("Error handling WebSocket connection: %s", e)
         finally:
             # Cleanup
             await self._cleanup_connection(websocket)
@@ -129,28 +219,59 @@ class StreamingTranslationServer:
     async def _handle_message(self, websocket, message):
         """Handle incoming WebSocket messages"""
         try:
-            data = json.loads(message)
+            # Binary frames carry raw PCM16 little-endian audio; no JSON or
+            # base64 involved
+            if isinstance(message, bytes):
+                await self._add_audio(
+                    websocket, np.frombuffer(message, dtype=np.int16)
+                )
+                return
+
+            data = orjson.loads(message)
             message_type = data.get("type")
 
-            if message_type == "audio_chunk":
-                await self._handle_audio_chunk(websocket, data)
-            elif message_type == "start_streaming":
-                await self._handle_start_streaming(websocket)
-            elif message_type == "stop_streaming":
-                await self._handle_stop_streaming(websocket)
-            elif message_type == "webrtc_offer":
-                await self._handle_webrtc_offer(websocket, data)
-            elif message_type == "webrtc_ice":
-                await self._handle_webrtc_ice(websocket, data)
-            elif message_type == "ping":
-                await websocket.send(json.dumps({"type": "pong"}))
+            handler = self._message_handlers.get(message_type)
+            if handler:
+                await handler(websocket, data)
             else:
-                logger.warning(f"Unknown message type: {message_type}")
+                logger.warning("Unknown message type: %s", message_type)
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             logger.error("Invalid JSON message received")
         except Exception as e:
-            logger.error(f"Error handling message: {e}")
+            logger.error("Error handling message: %s", e)
+
+    def _send(self, websocket, message):
+        """Queue a frame for the connection's writer task"""
+        state = self.connections.get(websocket)
+        if state is None or state.out_queue is None or state.close_task:
+            return
+        try:
+            state.out_queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # The client is not reading; drop it rather than buffer without limit
+            logger.warning("Outbound queue full; closing slow client")
+            state.close_task = asyncio.create_task(
+                websocket.close(code=1013, reason="Client too slow")
+            )
+
+    async def _writer_loop(self, websocket, out_queue: asyncio.Queue):
+        """Send queued frames to the client in order"""
+        try:
+            while True:
+                message = await out_queue.get()
+                await websocket.send(message)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception:
+            # Nothing is sending any more; close the socket so the client
+            # reconnects, and stop _send from queueing frames for it
+            logger.exception("Error sending WebSocket message")
+            state = self.connections.get(websocket)
+            if state is not None and state.close_task is None:
+                state.close_task = asyncio.create_task(
+                    websocket.close(code=1011, reason="Send failed")
+                )
 
     async def _handle_audio_chunk(self, websocket, data):
         """Handle incoming audio chunk"""
@@ -160,49 +281,54 @@ class StreamingTranslationServer:
             if not audio_base64:
                 return
 
-            audio_bytes = base64.b64decode(audio_base64)
+            # a2b_base64 accepts the ASCII str directly and skips base64.py's
+            # wrapper layer; frombuffer is a read-only view over the result
+            audio_bytes = binascii.a2b_base64(audio_base64)
             audio_data = np.frombuffer(audio_bytes, dtype=np.int16)
-
-            # Add to streaming service
-            streaming_service = self.connection_services.get(websocket)
-            if streaming_service:
-                await streaming_service.add_audio_chunk(audio_data)
+            await self._add_audio(websocket, audio_data)
 
         except Exception as e:
-            logger.error(f"Error handling audio chunk: {e}")
+            logger.error("Error handling audio chunk: %s", e)
 
-    async def _handle_start_streaming(self, websocket):
+    async def _add_audio(self, websocket, audio_data: np.ndarray):
+        """Add decoded PCM16 audio to the connection's streaming service"""
+        state = self.connections.get(websocket)
+        if state and state.service:
+            await state.service.add_audio_chunk(audio_data)
+
+    async def _handle_ping(self, websocket, _data):
+        """Handle keepalive ping"""
+        self._send(websocket, _PONG)
+
+    async def _handle_start_streaming(self, websocket, _data):
         """Handle start streaming request"""
         try:
-            streaming_service = self.connection_services.get(websocket)
-            if streaming_service:
-                await streaming_service.start_streaming()
-                await websocket.send(
-                    json.dumps({"type": "streaming_started", "status": "success"})
-                )
+            state = self.connections.get(websocket)
+            if state and state.service:
+                await state.service.start_streaming()
+                self._send(websocket, _STREAMING_STARTED)
                 logger.info("Streaming started for connection")
 
         except Exception as e:
-            logger.error(f"Error starting streaming: {e}")
-            await websocket.send(
-                json.dumps(
+            logger.error("Error starting streaming: %s", e)
+            self._send(
+                websocket,
+                _dumps(
                     {"type": "streaming_started", "status": "error", "message": str(e)}
-                )
+                ),
             )
 
-    async def _handle_stop_streaming(self, websocket):
+    async def _handle_stop_streaming(self, websocket, _data):
         """Handle stop streaming request"""
         try:
-            streaming_service = self.connection_services.get(websocket)
-            if streaming_service:
-                await streaming_service.stop_streaming()
-                await websocket.send(
-                    json.dumps({"type": "streaming_stopped", "status": "success"})
-                )
+            state = self.connections.get(websocket)
+            if state and state.service:
+                await state.service.stop_streaming()
+                self._send(websocket, _STREAMING_STOPPED)
                 logger.info("Streaming stopped for connection")
 
         except Exception as e:
-            logger.error(f"Error stopping streaming: {e}")
+            logger.error("Error stopping streaming: %s", e)
 
     async def _handle_webrtc_offer(self, websocket, data):
         """Handle incoming WebRTC SDP offer and set up peer connection"""
@@ -210,15 +336,18 @@ class StreamingTranslationServer:
             sdp = data.get("sdp")
             if not sdp:
                 return
+            state = self.connections.get(websocket)
+            if state is None:
+                return
             pc = RTCPeerConnection()
-            self.ws_to_pc[websocket] = pc
+            state.pc = pc
 
             # Handle client-initiated data channel
             @pc.on("datachannel")
             async def on_datachannel(channel):
                 if channel.label == "transcripts":
-                    self.ws_to_data_channel[websocket] = channel
-                    logger.info(f"Data channel '{channel.label}' received from client")
+                    state.data_channel = channel
+                    logger.info("Data channel '%s' received from client", channel.label)
 
             # Inbound audio handler
             @pc.on("track")
@@ -229,7 +358,7 @@ class StreamingTranslationServer:
                 # Consume audio frames and feed into ASR pipeline as PCM16
                 async def recv_audio():
                     # Resample all incoming audio to 16k mono s16 for ASR
-                    resampler = av.audio.resampler.AudioResampler(
+                    resampler = AudioResampler(
                         format="s16", layout="mono", rate=Config.SAMPLE_RATE
                     )
                     while True:
@@ -245,7 +374,7 @@ class StreamingTranslationServer:
                         frames = (
                             resampled if isinstance(resampled, list) else [resampled]
                         )
-                        streaming_service = self.connection_services.get(websocket)
+                        streaming_service = state.service
                         for rf in frames:
                             # Convert to numpy int16
                             pcm = rf.to_ndarray()
@@ -258,7 +387,7 @@ class StreamingTranslationServer:
 
             # Create a server-generated outbound audio track for TTS
             tts_track = TTSQueueAudioTrack()
-            self.ws_to_tts_track[websocket] = tts_track
+            state.tts_track = tts_track
             pc.addTrack(tts_track)
 
             await pc.setRemoteDescription(
@@ -269,7 +398,9 @@ class StreamingTranslationServer:
             answer = await pc.createAnswer()
             await pc.setLocalDescription(answer)
 
-            # Reply with SDP answer
+            # Reply with SDP answer; the multi-KB SDP string is the largest
+            # signaling message, so serialize it with orjson as well. Sent as
+            # text because the browser client JSON.parses every message
             resp = {
                 "type": "webrtc_answer",
                 "sdp": {
@@ -277,10 +408,10 @@ class StreamingTranslationServer:
                     "type": pc.localDescription.type,
                 },
             }
-            await websocket.send(json.dumps(resp))
+            self._send(websocket, _dumps(resp))
 
         except Exception as e:
-            logger.error(f"Error handling WebRTC offer: {e}")
+            logger.error("Error handling WebRTC offer: %s", e)
 
     async def _handle_webrtc_ice(self, websocket, data):
         """Handle remote ICE candidate from client"""
@@ -295,137 +426,140 @@ class StreamingTranslationServer:
             cand.sdpMid = candidate_dict["sdpMid"]
             cand.sdpMLineIndex = candidate_dict["sdpMLineIndex"]
 
-            pc = self.ws_to_pc.get(websocket)
-            if pc:
-                await pc.addIceCandidate(cand)
+            state = self.connections.get(websocket)
+            if state and state.pc:
+                await state.pc.addIceCandidate(cand)
 
         except Exception as e:
-            logger.error(f"Error handling ICE candidate: {e}")
+            logger.error("Error handling ICE candidate: %s", e)
 
     def _on_transcription(self, websocket):
         """Callback for when transcription is ready"""
+        return _TranscriptionCallback(self, websocket)
 
-        async def callback(transcribed_text: str):
-            try:
-                streaming_service = self.connection_services.get(websocket)
-                if not streaming_service:
-                    return
+    async def _handle_transcription(self, websocket, transcribed_text: str):
+        """Translate a finished transcription and deliver transcript and TTS"""
+        try:
+            state = self.connections.get(websocket)
+            if not state or not state.service:
+                return
 
-                source_lang = streaming_service.language
-                target_lang = "en-US" if source_lang == "zh-CN" else "zh-CN"
+            source_lang = state.service.language
+            target_lang = Config.TARGET_LANGUAGE[source_lang]
 
-                # Translate text
-                translated_text = await self.translation_service.translate(
-                    transcribed_text, source_lang
-                )
+            # Translate text
+            translated_text = await self.translation_service.translate(
+                transcribed_text, source_lang
+            )
 
-                if not translated_text:
-                    logger.warning("Translation resulted in empty text.")
-                    return
+            if not translated_text:
+                logger.warning("Translation resulted in empty text.")
+                return
 
-                # Generate TTS audio only if response_mode is "both"
-                response_mode = self.connection_response_modes.get(websocket, "both")
-                if response_mode == "both":
-                    # Generate TTS audio (raw WAV bytes) in a separate thread
-                    loop = asyncio.get_running_loop()
-                    audio_bytes = await loop.run_in_executor(
-                        None,
-                        self.tts_service.save_audio_in_memory,
-                        translated_text,
-                        target_lang,
-                    )
+            # Send transcript first so text is not held back by TTS synthesis
+            channel = state.data_channel
+            if channel and getattr(channel, "readyState", None) == "open":
+                payload = _dumps(
+                    {
+                        "type": "transcript",
+                        "transcribed_text": transcribed_text,
+                        "translated_text": translated_text,
+                        "source_language": source_lang,
+                        "target_language": target_lang,
+                    }
+                )
+                try:
+                    channel.send(payload)
+                    logger.debug("Sent transcript over data channel")
+                except Exception as e:
+                    logger.warning("Failed sending transcript on data channel: %s", e)
+            else:
+                logger.warning("No open data channel; unable to send transcript")
+
+            # Generate TTS audio only if response_mode is "both"
+            response_mode = state.response_mode
+            if response_mode == "both":
+                # Generate TTS audio (raw WAV bytes) in a separate thread
+                loop = asyncio.get_running_loop()
+                audio_bytes = await loop.run_in_executor(
+                    self._tts_executor,
+                    self.tts_service.save_audio_in_memory,
+                    translated_text,
+                    target_lang,
+                )
 
-                    if audio_bytes:
-                        # Enqueue to WebRTC TTS track if available; otherwise log warning
-                        tts_track = self.ws_to_tts_track.get(websocket)
-                        if tts_track and hasattr(tts_track, "enqueue_wav_bytes"):
-                            await tts_track.enqueue_wav_bytes(audio_bytes)
-                        else:
-                            logger.warning(
-                                "No WebRTC TTS track; unable to deliver audio"
-                            )
+                if audio_bytes:
+                    # Enqueue to WebRTC TTS track if available; otherwise log warning
+                    tts_track = state.tts_track
+                    if tts_track and hasattr(tts_track, "enqueue_wav_bytes"):
+                        await tts_track.enqueue_wav_bytes(audio_bytes)
                     else:
-                        logger.error("TTS service failed to generate audio.")
+                        logger.warning("No WebRTC TTS track; unable to deliver audio")
                 else:
-                    logger.debug(
-                        f"Response mode is '{response_mode}', skipping TTS audio generation"
-                    )
-
-                # Send transcript over data channel if available
-                channel = self.ws_to_data_channel.get(websocket)
-                if channel and getattr(channel, "readyState", None) == "open":
-                    payload = json.dumps(
-                        {
-                            "type": "transcript",
-                            "transcribed_text": transcribed_text,
-                            "translated_text": translated_text,
-                            "source_language": source_lang,
-                            "target_language": target_lang,
-                        }
-                    )
-                    try:
-                        channel.send(payload)
-                        logger.debug("Sent transcript over data channel")
-                    except Exception as e:
-                        logger.warning(
-                            f"Failed sending transcript on data channel: {e}"
-                        )
-                else:
-                    logger.warning("No open data channel; unable to send transcript")
-
-            except Exception as e:
-                logger.error(f"Error in transcription callback: {e}")
+                    logger.error("TTS service failed to generate audio.")
+            else:
+                logger.debug(
+                    "Response mode is '%s', skipping TTS audio generation",
+                    response_mode,
+                )
 
-        return callback
+        except Exception as e:
+            logger.error("Error in transcription callback: %s", e)
 
     async def _cleanup_connection(self, websocket):
         """Clean up connection resources"""
         try:
-            # Stop streaming service
-            streaming_service = self.connection_services.get(websocket)
-            if streaming_service:
-                await streaming_service.stop_streaming()
-                del self.connection_services[websocket]
-
             # Remove from active connections
-            self.active_connections.discard(websocket)
+            state = self.connections.pop(websocket, None)
+            if state is None:
+                return
 
-            # Remove response mode preference
-            self.connection_response_modes.pop(websocket, None)
+            # Stop streaming service; the client is gone, so queued audio is
+            # dropped rather than recognized
+            if state.service:
+                await state.service.stop_streaming(discard=True)
+
+            # Stop the writer; anything still queued is for a closed socket
+            if state.writer_task:
+                state.writer_task.cancel()
 
             # Close any peer connection
-            pc = self.ws_to_pc.get(websocket)
-            if pc:
-                await pc.close()
-                del self.ws_to_pc[websocket]
+            if state.pc:
+                await state.pc.close()
             # Close TTS track if present
-            tts_track = self.ws_to_tts_track.get(websocket)
-            if tts_track:
+            if state.tts_track:
                 try:
-                    await tts_track.close()
+                    await state.tts_track.close()
                 except Exception:
                     pass
-                del self.ws_to_tts_track[websocket]
 
             # Close data channel if present
-            channel = self.ws_to_data_channel.get(websocket)
-            if channel:
+            if state.data_channel:
                 try:
-                    channel.close()
+                    state.data_channel.close()
                 except Exception:
                     pass
-                del self.ws_to_data_channel[websocket]
 
             logger.info(
-                f"Connection cleaned up. Total connections: {len(self.active_connections)}"
+                "Connection cleaned up. Total connections: %d", len(self.connections)
             )
 
         except Exception as e:
-            logger.error(f"Error cleaning up connection: {e}")
+            logger.error("Error cleaning up connection: %s", e)
 
     async def start_server(self, host: str = "0.0.0.0", port: int = 8000):
         """Start the WebSocket server and an HTTP health endpoint"""
         try:
+            # Masking inbound frames is done in C when websockets was built
+            # with its speedups extension; the pure-Python fallback is slow
+            try:
+                import websockets.speedups  # noqa: F401
+            except ImportError:
+                logger.warning(
+                    "websockets C speedups unavailable; frame unmasking runs "
+                    "in pure Python"
+                )
+
             # Configure WebSocket server with ping/pong settings
             server = await websockets.serve(
                 self.handle_connection,
@@ -434,15 +568,23 @@ class StreamingTranslationServer:
                 ping_interval=20,  # Send ping every 20 seconds
                 ping_timeout=10,  # Wait 10 seconds for pong response
                 close_timeout=10,  # Wait 10 seconds for close
+                # Oversized messages close the connection (1009) before they
+                # are buffered in full
+                max_size=Config.MAX_WS_MESSAGE_BYTES,
+                # Incoming messages buffered per connection before reads pause
+                max_queue=64,
+                # PCM16 and base64 audio barely compress; permessage-deflate
+                # would only burn CPU on every frame in both directions
+                compression=None,
             )
 
-            logger.info(f"WebSocket streaming server started on ws://{host}:{port}")
+            logger.info("WebSocket streaming server started on ws://%s:%s", host, port)
 
             # Start aiohttp app for health check
             app = web.Application()
 
             async def healthz(_request):
-                return web.json_response({"status": "ok"})
+                return web.Response(body=_HEALTH_BODY, content_type="application/json")
 
             app.router.add_get("/healthz", healthz)
 
@@ -451,15 +593,17 @@ class StreamingTranslationServer:
             http_site = web.TCPSite(runner, host, port + 1)
             await http_site.start()
             logger.info(
-                f"HTTP health endpoint started on http://{host}:{port+1}/healthz"
+                "HTTP health endpoint started on http://%s:%s/healthz", host, port + 1
             )
 
             # Keep servers running
             await server.wait_closed()
 
         except Exception as e:
-            logger.error(f"Error starting WebSocket server: {e}")
+            logger.error("Error starting WebSocket server: %s", e)
             raise
+        finally:
+            self._tts_executor.shutdown(wait=False, cancel_futures=True)
 
 
 class TTSQueueAudioTrack(MediaStreamTrack):
@@ -469,36 +613,94 @@ class TTSQueueAudioTrack(MediaStreamTrack):
 
     def __init__(self):
         super().__init__()
-        self._queue: asyncio.Queue[av.AudioFrame] = asyncio.Queue()
+        # Single producer (enqueue_wav_bytes) and single consumer (aiortc
+        # calling recv), both on the event loop, so a plain deque plus a wakeup
+        # event is enough; asyncio.Queue adds a getter waiter per frame.
+        # Bounded: enqueueing waits for room, and only a stalled sender makes
+        # it drop the oldest audio instead of growing
+        self._frames: deque = deque()
+        self._frame_ready = asyncio.Event()
+        self._space_ready = asyncio.Event()
+        self._dropped_frames = 0
         self._closed = False
-        self._pts_offset = 0  # Running PTS offset for continuous stream
+        self._pts_offset = 0  # Running PTS (in samples) of sent frames
+
+    @staticmethod
+    def _wav_frames(wav_bytes: bytes):
+        """Split 16-bit PCM WAV bytes into 20 ms s16 AudioFrames"""
+        # WAV is a RIFF header around raw PCM; reading it with the wave module
+        # avoids opening a PyAV container and decoder for every clip
+        with wave.open(io.BytesIO(wav_bytes), "rb") as wav:
+            channels = wav.getnchannels()
+            rate = wav.getframerate()
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"Unsupported WAV sample width: {wav.getsampwidth()}")
+            pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+        layout = "mono" if channels == 1 else "stereo"
+        # Packed s16 frames are shaped (1, samples * channels)
+        step = (rate // 50) * channels
+        for start in range(0, len(pcm), step):
+            frame = av.AudioFrame.from_ndarray(
+                pcm[start : start + step].reshape(1, -1), format="s16", layout=layout
+            )
+            frame.sample_rate = rate
+            yield frame
 
     async def enqueue_wav_bytes(self, wav_bytes: bytes):
-        """Decode WAV bytes, offset timestamps, and enqueue for sending."""
+        """Decode WAV bytes and enqueue 48 kHz mono frames for sending."""
+        # One resampler per clip: its filter graph keeps a delay tail of the
+        # last input, so it must not carry audio over into another clip
+        resampler = None
         try:
-            max_pts_in_file = 0
-            with av.open(io.BytesIO(wav_bytes), format="wav") as container:
-                resampler = av.audio.resampler.AudioResampler(
-                    format="s16", layout="mono", rate=48000
-                )
-                for frame in container.decode(audio=0):
-                    resampled_frames = resampler.resample(frame)
-                    for r_frame in resampled_frames:
-                        # Offset the PTS of each frame to make it continuous
-                        r_frame.pts += self._pts_offset
-                        max_pts_in_file = r_frame.pts  # Track the latest PTS
-                        await self._queue.put(r_frame)
-
-            # Update the offset for the next audio clip
-            self._pts_offset = max_pts_in_file + 1
+            for frame in self._wav_frames(wav_bytes):
+                if frame.sample_rate == _TTS_OUT_RATE and frame.layout.name == "mono":
+                    # Already in the outbound format; no resampling needed
+                    out_frames = [frame]
+                else:
+                    if resampler is None:
+                        resampler = AudioResampler(
+                            format="s16", layout="mono", rate=_TTS_OUT_RATE
+                        )
+                    out_frames = resampler.resample(frame)
+                for r_frame in out_frames:
+                    await self._put_frame(r_frame)
 
         except Exception as e:
-            logger.error(f"Failed to enqueue WAV bytes: {e}")
+            logger.error("Failed to enqueue WAV bytes: %s", e)
+
+    async def _put_frame(self, frame: av.AudioFrame):
+        """Append a frame, waiting for the sender to make room if full"""
+        while len(self._frames) >= _TTS_MAX_FRAMES:
+            self._space_ready.clear()
+            try:
+                await asyncio.wait_for(self._space_ready.wait(), _TTS_STALL_SECONDS)
+            except asyncio.TimeoutError:
+                # Nothing was sent for a while; keep the newest audio
+                self._frames.popleft()
+                self._dropped_frames += 1
+                if self._dropped_frames % _TTS_DROP_LOG_EVERY == 1:
+                    logger.warning(
+                        "TTS track sender stalled; dropped %d frames so far",
+                        self._dropped_frames,
+                    )
+        self._frames.append(frame)
+        self._frame_ready.set()
 
     async def recv(self) -> av.AudioFrame:
         if self._closed:
             raise asyncio.CancelledError()
-        frame = await self._queue.get()
+        while not self._frames:
+            self._frame_ready.clear()
+            await self._frame_ready.wait()
+        frame = self._frames.popleft()
+        self._space_ready.set()
+        # Stamp frames as they are sent, from a running sample count, so the
+        # stream stays continuous across clips (each clip's resampler starts
+        # counting from zero) and dropped frames leave no timestamp holes
+        frame.pts = self._pts_offset
+        frame.time_base = _TTS_OUT_TIME_BASE
+        self._pts_offset += frame.samples
         return frame
 
 
@@ -518,4 +720,13 @@ async def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    # uvloop ships with uvicorn[standard] on Linux/macOS; fall back to the
+    # default loop where it is unavailable (e.g. Windows)
+    try:
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
     asyncio.run(main())
@@ -0,0 +1,96 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+pytest.importorskip("speech_recognition")
+
+from src.service.transcription_service import StreamingSpeechService  # noqa: E402
+
+SAMPLE_RATE = 16000
+# 100 ms chunks; three voiced plus two silent chunks make one 500 ms utterance
+SPEECH = np.full(SAMPLE_RATE // 10, 2000, dtype=np.int16)
+SILENCE = np.zeros(SAMPLE_RATE // 10, dtype=np.int16)
+
+
+def _make_service() -> StreamingSpeechService:
+    return StreamingSpeechService(
+        language="en-US",
+        sample_rate=SAMPLE_RATE,
+        vad_silence_ms=200,
+        vad_min_utterance_ms=100,
+        queue_size_ms=1000,
+    )
+
+
+async def _speak_utterance(service: StreamingSpeechService):
+    for chunk in (SPEECH, SPEECH, SPEECH, SILENCE, SILENCE):
+        await service.add_audio_chunk(chunk)
+    # Let the VAD worker drain the audio queue and flush the utterance
+    await asyncio.sleep(0.01)
+
+
+def _stalled_recognition(service: StreamingSpeechService):
+    """Replace recognition with a stub that blocks until released"""
+    release = asyncio.Event()
+    recognized = []
+
+    async def stalled(audio_data):
+        recognized.append(audio_data.size)
+        await release.wait()
+
+    service._process_audio_buffer = stalled
+    return release, recognized
+
+
+def test_recognition_backlog_stays_bounded_when_recognition_stalls():
+    async def run():
+        service = _make_service()
+        release, recognized = _stalled_recognition(service)
+        await service.start_streaming()
+
+        for _ in range(50):
+            await _speak_utterance(service)
+            assert service._queued_utterance_samples <= service._max_queued_samples
+
+        # One utterance is being recognized; only queue_size_ms more may wait
+        assert len(recognized) == 1
+        assert service.utterance_queue.qsize() == 2
+
+        release.set()
+        await service.stop_streaming()
+
+    asyncio.run(run())
+
+
+def test_stop_streaming_recognizes_queued_utterances():
+    async def run():
+        service = _make_service()
+        release, recognized = _stalled_recognition(service)
+        await service.start_streaming()
+        await _speak_utterance(service)
+        await _speak_utterance(service)
+
+        release.set()
+        await service.stop_streaming()
+        assert len(recognized) == 2
+
+    asyncio.run(run())
+
+
+def test_stop_streaming_discard_skips_queued_utterances():
+    async def run():
+        service = _make_service()
+        _release, recognized = _stalled_recognition(service)
+        await service.start_streaming()
+        await _speak_utterance(service)
+        await _speak_utterance(service)
+        await service.add_audio_chunk(SPEECH)
+
+        # Returns without waiting for the stalled recognition or queued audio
+        await asyncio.wait_for(service.stop_streaming(discard=True), timeout=1)
+        assert len(recognized) == 1
+        assert service.utterance_queue.empty()
+        assert service.current_utterance_samples == 0
+
+    asyncio.run(run())